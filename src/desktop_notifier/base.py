@@ -298,6 +298,35 @@ class DesktopNotifierBase:
         """
         raise NotImplementedError()
 
+    async def clear_many(self, notifications: Sequence[Notification]) -> None:
+        """
+        Removes the given notifications from the notification center. This is a wrapper
+        method which mostly performs housekeeping of notifications ID and calls
+        :meth:`_clear_many` to actually clear the notifications. Platform
+        implementations may override :meth:`_clear_many` if they support removing
+        multiple notifications at once.
+
+        :param notifications: Notifications to clear.
+        """
+
+        to_clear = [n for n in notifications if n.identifier]
+
+        if to_clear:
+            await self._clear_many(to_clear)
+
+        for notification in notifications:
+            self._clear_notification_from_cache(notification)
+
+    async def _clear_many(self, notifications: Sequence[Notification]) -> None:
+        """
+        Removes the given notifications from the notification center. Defaults to
+        calling :meth:`_clear` for each notification.
+
+        :param notifications: Notifications to clear.
+        """
+        for notification in notifications:
+            await self._clear(notification)
+
     async def clear_all(self) -> None:
         """
         Clears all notifications from the notification center. This is a wrapper method
@@ -11,16 +11,17 @@ UNUserNotificationCenter backend for macOS.
 
 # system imports
 import uuid
+import itertools
+from collections import OrderedDict
 import logging
 import enum
 import asyncio
-from concurrent.futures import Future
 from urllib.parse import urlparse, unquote
-from typing import cast, Optional
+from typing import Any, Dict, Optional, Sequence, Set
 
 # external imports
 from packaging.version import Version
-from rubicon.objc import NSObject, ObjCClass, objc_method, py_from_ns
+from rubicon.objc import NSObject, ObjCClass, ObjCInstance, objc_method, py_from_ns
 from rubicon.objc.runtime import load_library, objc_id, objc_block
 
 # local imports
@@ -46,9 +47,42 @@ UNNotificationAttachment = ObjCClass("UNNotificationAttachment")
 UNNotificationSettings = ObjCClass("UNNotificationSettings")
 
 NSURL = ObjCClass("NSURL")
+NSString = ObjCClass("NSString")
 NSSet = ObjCClass("NSSet")
+NSMutableArray = ObjCClass("NSMutableArray")
+NSArray = ObjCClass("NSArray")
+NSDictionary = ObjCClass("NSDictionary")
 NSError = ObjCClass("NSError")
 
+# Resolve methods which are called for every notification once to avoid the dynamic
+# attribute lookup on each call.
+_UNMutableNotificationContent_alloc = UNMutableNotificationContent.alloc
+_UNNotificationRequest_requestWithIdentifier = (
+    UNNotificationRequest.requestWithIdentifier
+)
+_UNNotificationAttachment_attachmentWithIdentifier = (
+    UNNotificationAttachment.attachmentWithIdentifier
+)
+_NSURL_fileURLWithPath = NSURL.fileURLWithPath
+_UNNotificationAction_actionWithIdentifier = UNNotificationAction.actionWithIdentifier
+_UNTextInputNotificationAction_actionWithIdentifier = (
+    UNTextInputNotificationAction.actionWithIdentifier
+)
+_UNNotificationCategory_categoryWithIdentifier = (
+    UNNotificationCategory.categoryWithIdentifier
+)
+
+# The default sound is a singleton.
+_DEFAULT_SOUND = UNNotificationSound.defaultSound
+
+# Immutable empty collections to pass as arguments, instead of converting new empty
+# Python collections on every call.
+_EMPTY_NSARRAY = NSArray.array()
+_EMPTY_NSDICT = NSDictionary.dictionary()
+
+# Maximum number of cached NSStrings for recurring identifiers.
+_NSSTRING_CACHE_SIZE = 128
+
 # UserNotifications.h
 
 UNNotificationDefaultActionIdentifier = (
@@ -96,6 +130,23 @@ class UNNotificationInterruptionLevel(enum.Enum):
     Critical = 3
 
 
+def _set_future_result(future: "asyncio.Future[Any]", result: Any) -> None:
+    """
+    Sets the result of a future from a completion handler, unless the awaiting task has
+    been cancelled in the meantime. Must be scheduled on the future's event loop with
+    ``call_soon_threadsafe``. Retained Objective-C results which are no longer awaited
+    are released.
+
+    :param future: The future to resolve.
+    :param result: The result to set.
+    """
+    if future.done():
+        if isinstance(result, ObjCInstance):
+            result.release()
+    else:
+        future.set_result(result)
+
+
 class NotificationCenterDelegate(NSObject):  # type: ignore
     """Delegate to handle user interactions with notifications"""
 
@@ -104,28 +155,37 @@ class NotificationCenterDelegate(NSObject):  # type: ignore
         self, center, response, completion_handler: objc_block
     ) -> None:
         # Get the notification which was clicked from the platform ID.
-        platform_nid = py_from_ns(response.notification.request.identifier)
-        py_notification = self.interface._notification_for_nid[platform_nid]
-        py_notification = cast(Notification, py_notification)
+        request = response.notification.request
+        platform_nid = py_from_ns(request.identifier)
+        py_notification = self.notification_for_nid.get(platform_nid)
 
-        self.interface._clear_notification_from_cache(py_notification)
+        # Ignore notifications which we do not know about, for instance because they
+        # were delivered before a restart.
+        if py_notification is None:
+            completion_handler()
+            return
 
-        # Invoke the callback which corresponds to the user interaction.
-        if response.actionIdentifier == UNNotificationDefaultActionIdentifier:
+        self.clear_notification_from_cache(py_notification)
+
+        # Invoke the callback which corresponds to the user interaction. Fetch and
+        # convert the action identifier only once.
+        action_id = py_from_ns(response.actionIdentifier)
+
+        if action_id == UNNotificationDefaultActionIdentifier:
             if py_notification.on_clicked:
                 py_notification.on_clicked()
 
-        elif response.actionIdentifier == UNNotificationDismissActionIdentifier:
+        elif action_id == UNNotificationDismissActionIdentifier:
             if py_notification.on_dismissed:
                 py_notification.on_dismissed()
 
-        elif response.actionIdentifier == ReplyActionIdentifier:
+        elif action_id == ReplyActionIdentifier:
             if py_notification.reply_field.on_replied:
                 reply_text = py_from_ns(response.userText)
                 py_notification.reply_field.on_replied(reply_text)
 
         else:
-            button_number = int(py_from_ns(response.actionIdentifier))
+            button_number = int(action_id)
             callback = py_notification.buttons[button_number].on_pressed
 
             if callback:
@@ -153,6 +213,19 @@ class CocoaNotificationCenter(DesktopNotifierBase):
         Urgency.Critical: UNNotificationInterruptionLevel.TimeSensitive,
     }
 
+    # Notification categories are registered per app, not per notifier instance. Keep
+    # track of them on the class so that clearing the categories from any instance
+    # invalidates the cache for all instances in this process. Other processes using
+    # desktop-notifier share the same registry but not this cache: if they clear or
+    # replace the categories, notifications from this process may be sent without
+    # buttons or reply field until a new set of buttons forces a refetch.
+
+    # Identifiers of notification categories which we believe to be registered.
+    _category_ids: Set[str] = set()
+    # The notification categories which were registered from this process, by their
+    # identifiers.
+    _categories: Dict[str, Any] = {}
+
     def __init__(
         self,
         app_name: str = "Python",
@@ -162,8 +235,25 @@ class CocoaNotificationCenter(DesktopNotifierBase):
         self.nc = UNUserNotificationCenter.currentNotificationCenter()
         self.nc_delegate = NotificationCenterDelegate.alloc().init()
         self.nc_delegate.interface = self
+        # Give the delegate direct access to the mapping of notification IDs and to the
+        # method which clears it, avoiding a lookup through the interface on each
+        # callback. The dict is never replaced, only mutated.
+        self.nc_delegate.notification_for_nid = self._notification_for_nid
+        self.nc_delegate.clear_notification_from_cache = (
+            self._clear_notification_from_cache
+        )
         self.nc.delegate = self.nc_delegate
 
+        # Notification identifiers only need to be unique within the notification
+        # center. Use a counter with a random prefix per instance instead of a new UUID
+        # for each notification.
+        self._nid_prefix = uuid.uuid4().hex[:8]
+        self._nid_counter = itertools.count()
+
+        # NSStrings for identifiers which are typically reused between notifications,
+        # in least recently used order.
+        self._nsstring_cache: OrderedDict[str, Any] = OrderedDict()
+
         self._clear_notification_categories()
 
     async def request_authorisation(self) -> bool:
@@ -176,12 +266,16 @@ class CocoaNotificationCenter(DesktopNotifierBase):
         :returns: Whether authorisation has been granted.
         """
 
-        future: Future[tuple[bool, str]] = Future()
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[tuple[bool, str]] = loop.create_future()
 
         def on_auth_completed(granted: bool, error: objc_id) -> None:
-            ns_error = py_from_ns(error)
-            error_str = str(ns_error.localizedDescription) if ns_error else ""
-            future.set_result((granted, error_str))
+            # Only convert the error in the rare case that there is one.
+            if error:
+                error_str = str(py_from_ns(error).localizedDescription)
+            else:
+                error_str = ""
+            loop.call_soon_threadsafe(_set_future_result, future, (granted, error_str))
 
         self.nc.requestAuthorizationWithOptions(
             UNAuthorizationOptionAlert
@@ -190,7 +284,7 @@ class CocoaNotificationCenter(DesktopNotifierBase):
             completionHandler=on_auth_completed,
         )
 
-        granted, error_str = await asyncio.wrap_future(future)
+        granted, error_str = await future
 
         if error_str:
             logger.warning("Authorisation denied: %s", error_str)
@@ -200,27 +294,25 @@ class CocoaNotificationCenter(DesktopNotifierBase):
     async def has_authorisation(self) -> bool:
         """Whether we have authorisation to send notifications."""
 
-        # Get existing notification categories.
-
-        future: Future[UNNotificationSettings] = Future()  # type:ignore
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[int] = loop.create_future()
 
         def handler(settings: objc_id) -> None:
-            settings = py_from_ns(settings)
-            settings.retain()
-            future.set_result(settings)
+            # Only read the status while the settings are alive. This avoids converting
+            # and retaining the settings object.
+            status = ObjCInstance(settings).authorizationStatus
+            loop.call_soon_threadsafe(_set_future_result, future, status)
 
         self.nc.getNotificationSettingsWithCompletionHandler(handler)
 
-        settings = await asyncio.wrap_future(future)
+        status = await future
 
-        authorized = settings.authorizationStatus in (  # type:ignore
+        authorized = status in (
             UNAuthorizationStatusAuthorized,
             UNAuthorizationStatusProvisional,
             UNAuthorizationStatusEphemeral,
         )
 
-        settings.release()  # type:ignore
-
         return authorized
 
     async def _send(
@@ -238,43 +330,48 @@ class CocoaNotificationCenter(DesktopNotifierBase):
         if notification_to_replace:
             platform_nid = str(notification_to_replace.identifier)
         else:
-            platform_nid = str(uuid.uuid4())
+            platform_nid = f"{self._nid_prefix}-{next(self._nid_counter)}"
 
         # On macOS, we need to register a new notification category for every
         # unique set of buttons.
         category_id = await self._create_category_for_notification(notification)
 
         # Create the native notification and notification request.
-        content = UNMutableNotificationContent.alloc().init()
+        content = _UNMutableNotificationContent_alloc().init()
         content.title = notification.title
         content.body = notification.message
-        content.categoryIdentifier = category_id
-        content.threadIdentifier = notification.thread
+        content.categoryIdentifier = self._ns(category_id)
+        content.threadIdentifier = self._ns(notification.thread)
         if macos_version >= Version("12.0"):
             content.interruptionLevel = self._to_native_urgency[notification.urgency]
 
         if notification.sound:
-            content.sound = UNNotificationSound.defaultSound
+            content.sound = _DEFAULT_SOUND
 
         if notification.attachment:
             path = unquote(urlparse(notification.attachment).path)
-            url = NSURL.fileURLWithPath(path, isDirectory=False)
-            attachment = UNNotificationAttachment.attachmentWithIdentifier(
-                "", URL=url, options={}, error=None
+            url = _NSURL_fileURLWithPath(path, isDirectory=False)
+            attachment = _UNNotificationAttachment_attachmentWithIdentifier(
+                "", URL=url, options=_EMPTY_NSDICT, error=None
             )
             content.attachments = [attachment]
 
-        notification_request = UNNotificationRequest.requestWithIdentifier(
+        notification_request = _UNNotificationRequest_requestWithIdentifier(
             platform_nid, content=content, trigger=None
         )
 
-        future: Future[NSError] = Future()  # type:ignore
+        # Resolve the future from the completion handler without blocking the event
+        # loop, so that multiple notifications can be posted concurrently.
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Optional[NSError]] = loop.create_future()  # type:ignore
 
         def handler(error: objc_id) -> None:
-            ns_error = py_from_ns(error)
-            if ns_error:
+            if error:
+                ns_error = py_from_ns(error)
                 ns_error.retain()
-            future.set_result(ns_error)
+            else:
+                ns_error = None
+            loop.call_soon_threadsafe(_set_future_result, future, ns_error)
 
         # Post the notification.
         self.nc.addNotificationRequest(
@@ -282,7 +379,7 @@ class CocoaNotificationCenter(DesktopNotifierBase):
         )
 
         # Error handling.
-        error = await asyncio.wrap_future(future)
+        error = await future
 
         if error:
             error.autorelease()  # type:ignore
@@ -323,73 +420,129 @@ class CocoaNotificationCenter(DesktopNotifierBase):
         if not (notification.buttons or notification.reply_field):
             return None
 
-        button_titles = tuple(notification.buttons)
-        ui_repr = f"buttons={button_titles}, reply_field={notification.reply_field}"
-        category_id = f"desktop-notifier: {ui_repr}"
-
-        # Retrieve existing categories. We do not cache this value because it may be
-        # modified by other Python processes using desktop-notifier.
-
-        categories = await self._get_notification_categories()
-        category_ids = set(py_from_ns(c.identifier) for c in categories.allObjects())  # type: ignore
-
-        # Register new category if necessary.
-        if category_id not in category_ids:
-            # Create action for each button.
-            actions = []
-
-            if notification.reply_field:
-                action = UNTextInputNotificationAction.actionWithIdentifier(
-                    ReplyActionIdentifier,
-                    title=notification.reply_field.title,
-                    options=UNNotificationActionOptionNone,
-                    textInputButtonTitle=notification.reply_field.button_title,
-                    textInputPlaceholder="",
-                )
-                actions.append(action)
-
-            for n, button in enumerate(notification.buttons):
-                action = UNNotificationAction.actionWithIdentifier(
-                    str(n), title=button.title, options=UNNotificationActionOptionNone
-                )
-                actions.append(action)
-
-            # Add category for new set of buttons.
-
-            new_categories = categories.setByAddingObject(  # type: ignore
-                UNNotificationCategory.categoryWithIdentifier(
-                    category_id,
-                    actions=actions,
-                    intentIdentifiers=[],
-                    options=UNNotificationCategoryOptionNone,
-                )
+        # The category only depends on the titles of buttons and reply field. Prefix
+        # the number of buttons to keep the identifier unambiguous. Note that NUL
+        # cannot be used as separator since NSStrings are created from C strings.
+        id_parts = [str(len(notification.buttons))]
+        id_parts.extend(button.title for button in notification.buttons)
+
+        if notification.reply_field:
+            id_parts.append(notification.reply_field.title)
+            id_parts.append(notification.reply_field.button_title)
+
+        category_id = "desktop-notifier:" + "\x1f".join(id_parts)
+
+        # Return early if we believe the category to be registered already. See the
+        # class comment for the limitations of this cache.
+        if category_id in self._category_ids:
+            return category_id
+
+        # Retrieve the registered categories on a cache miss. This picks up categories
+        # registered by other processes, so that we do not remove them below.
+
+        registered = await self._get_notification_categories()
+        self._category_ids.clear()
+        self._category_ids.update(
+            py_from_ns(c.identifier) for c in registered.allObjects()  # type: ignore
+        )
+
+        if category_id in self._category_ids:
+            return category_id
+
+        # Create action for each button. Collect them in an NSMutableArray directly
+        # instead of converting a Python list when creating the category.
+        actions = NSMutableArray.alloc().init()
+
+        if notification.reply_field:
+            action = _UNTextInputNotificationAction_actionWithIdentifier(
+                ReplyActionIdentifier,
+                title=notification.reply_field.title,
+                options=UNNotificationActionOptionNone,
+                textInputButtonTitle=notification.reply_field.button_title,
+                textInputPlaceholder="",
             )
-            self.nc.setNotificationCategories(new_categories)
+            actions.addObject(action)
+
+        for n, button in enumerate(notification.buttons):
+            action = _UNNotificationAction_actionWithIdentifier(
+                str(n), title=button.title, options=UNNotificationActionOptionNone
+            )
+            actions.addObject(action)
+
+        # Keep the new category together with those which we registered previously.
+        category = _UNNotificationCategory_categoryWithIdentifier(
+            category_id,
+            actions=actions,
+            intentIdentifiers=_EMPTY_NSARRAY,
+            options=UNNotificationCategoryOptionNone,
+        )
+        category.retain()
+        self._categories[category_id] = category
+
+        # Merge our categories, including the new one, into those which are currently
+        # registered. This keeps categories of other processes and re-registers any of
+        # ours which were removed in the meantime.
+        categories = registered.mutableCopy()  # type: ignore
+        for identifier, category in self._categories.items():
+            if identifier not in self._category_ids:
+                categories.addObject(category)
+                self._category_ids.add(identifier)
+
+        self.nc.setNotificationCategories(categories)
 
         return category_id
 
     async def _get_notification_categories(self) -> NSSet:  # type:ignore
         """Returns the registered notification categories for this app / Python."""
 
-        future: Future[NSSet] = Future()  # type:ignore
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[NSSet] = loop.create_future()  # type:ignore
 
         def handler(categories: objc_id) -> None:
             categories = py_from_ns(categories)
             categories.retain()
-            future.set_result(categories)
+            loop.call_soon_threadsafe(_set_future_result, future, categories)
 
         self.nc.getNotificationCategoriesWithCompletionHandler(handler)
 
-        categories = await asyncio.wrap_future(future)
+        categories = await future
         categories.autorelease()  # type:ignore
 
         return categories
 
     def _clear_notification_categories(self) -> None:
         """Clears all registered notification categories for this application."""
+        for category in self._categories.values():
+            category.release()
+
+        self._categories.clear()
+        self._category_ids.clear()
+
         empty_set = NSSet.alloc().init()
         self.nc.setNotificationCategories(empty_set)
 
+    def _ns(self, string: Optional[str]) -> Optional[Any]:
+        """
+        Returns a cached NSString for the given string. Should only be used for strings
+        which are likely to recur, such as category and thread identifiers. Only the
+        most recently used strings are kept.
+
+        :param string: The Python string to convert.
+        :returns: The corresponding NSString or None.
+        """
+        if string is None:
+            return None
+
+        try:
+            self._nsstring_cache.move_to_end(string)
+            return self._nsstring_cache[string]
+        except KeyError:
+            ns_string = NSString.alloc().initWithUTF8String(string.encode("utf-8"))
+            self._nsstring_cache[string] = ns_string
+            if len(self._nsstring_cache) > _NSSTRING_CACHE_SIZE:
+                self._nsstring_cache.popitem(last=False)
+            return ns_string
+
     async def _clear(self, notification: Notification) -> None:
         """
         Removes a notifications from the notification center
@@ -398,6 +551,16 @@ class CocoaNotificationCenter(DesktopNotifierBase):
         """
         self.nc.removeDeliveredNotificationsWithIdentifiers([notification.identifier])
 
+    async def _clear_many(self, notifications: Sequence[Notification]) -> None:
+        """
+        Removes multiple notifications from the notification center with a single call.
+
+        :param notifications: Notifications to clear.
+        """
+        self.nc.removeDeliveredNotificationsWithIdentifiers(
+            [notification.identifier for notification in notifications]
+        )
+
     async def _clear_all(self) -> None:
         """
         Clears all notifications from notification center. This method does not affect
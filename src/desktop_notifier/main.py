@@ -366,6 +366,15 @@ class DesktopNotifier:
         with self._lock:
             await self._impl.clear(notification)
 
+    async def clear_many(self, notifications: Sequence[Notification]) -> None:
+        """
+        Removes the given notifications from the notification center.
+
+        :param notifications: Notifications to clear.
+        """
+        with self._lock:
+            await self._impl.clear_many(notifications)
+
     async def clear_all(self) -> None:
         """
         Removes all currently displayed notifications for this app from the notification